@@ -1,12 +1,18 @@
+import asyncio
 from fastapi import FastAPI
 from controllers.prediction import router as prediction_router
 from controllers.stats import router as stats_router
 from controllers.image import router as images_router
 from controllers.labels import router as labels_router
 from controllers.health import router as health_router
+from controllers.batch import router as batch_router
+from controllers.stream import router as stream_router
 from database.db import init_db
 from multiprocessing import Process
 from typing import Optional
+from services import event_listener
+from services.cache import response_cache
+from services.prediction_stream import prediction_hub
 from services.worker import (
     start_receive_worker,
     stop_receive_worker,
@@ -22,25 +28,34 @@ app.include_router(stats_router)
 app.include_router(images_router)
 app.include_router(labels_router)
 app.include_router(health_router)
+app.include_router(batch_router)
+app.include_router(stream_router)
+event_listener.add_handler(response_cache.handle_event)
+event_listener.add_handler(prediction_hub.handle_event)
 
 _worker_process: Optional[Process] = None
 _billing_thread = None
 _analytics_thread = None
+_event_listener_task: Optional[asyncio.Task] = None
 
 
 @app.on_event("startup")
 async def _app_startup() -> None:
-    global _worker_process, _billing_thread, _analytics_thread
+    global _worker_process, _billing_thread, _analytics_thread, _event_listener_task
     _worker_process = start_receive_worker() # pragma: no cover
     _billing_thread = start_billing_consumer_thread() # pragma: no cover
     _analytics_thread = start_analytics_consumer_thread() # pragma: no cover
+    _event_listener_task = asyncio.create_task(event_listener.listen()) # pragma: no cover
 
 
 @app.on_event("shutdown")
 async def _app_shutdown() -> None:
-    global _worker_process
+    global _worker_process, _event_listener_task
     stop_receive_worker(_worker_process)
     _worker_process = None
+    if _event_listener_task is not None:
+        _event_listener_task.cancel()
+        _event_listener_task = None
 
 
 
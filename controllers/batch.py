@@ -0,0 +1,133 @@
+import asyncio
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from database.db import get_db
+from dependencies.auth import get_current_user_id
+from queries.queries import query_batch_progress, query_prediction_batch, save_prediction_batch
+from services.amqp_publisher import get_publisher
+from services.uploads import UploadError, stream_multipart_uploads, upload_filename
+
+router = APIRouter()
+
+UPLOAD_DIR = "uploads/original"
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "5000"))
+MAX_BATCH_UPLOADS = int(os.getenv("MAX_BATCH_UPLOADS", "100"))
+
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def _read_json_batch(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    keys = body.get("keys") if isinstance(body, dict) else None
+    if not isinstance(keys, list) or not keys or not all(isinstance(k, str) and k for k in keys):
+        raise HTTPException(status_code=422, detail="'keys' must be a non-empty list of S3 keys")
+    if len(keys) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} keys per batch")
+    return body
+
+
+@router.post("/predictions/batch")
+async def submit_batch(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue many images at once.
+
+    Send JSON {"keys": [...], "chat_id"?, "callback_url"?} with S3 keys, or a
+    multipart body with several 'file' parts. All jobs are published on one
+    channel with publisher confirms.
+    """
+    batch_id = str(uuid.uuid4())
+    content_type = request.headers.get("content-type", "")
+    stored_paths: List[str] = []
+    uids: List[str] = []
+
+    if content_type.startswith("multipart/form-data"):
+        def path_for(filename: str) -> str:
+            uid = str(uuid.uuid4())
+            uids.append(uid)
+            return os.path.join(UPLOAD_DIR, upload_filename(filename, uid))
+
+        try:
+            stored_paths, fields = await stream_multipart_uploads(
+                request.stream(), content_type, path_for, max_files=MAX_BATCH_UPLOADS
+            )
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+        sources = [{"source": "path", "path": path} for path in stored_paths]
+        chat_id: Optional[str] = fields.get("chat_id")
+        callback_url: Optional[str] = fields.get("callback_url")
+    else:
+        body = await _read_json_batch(request)
+        sources = [{"img": key} for key in body["keys"]]
+        uids = [str(uuid.uuid4()) for _ in sources]
+        chat_id = body.get("chat_id")
+        callback_url = body.get("callback_url")
+
+    jobs = []
+    for uid, source in zip(uids, sources):
+        job: Dict[str, Any] = {
+            "type": "yolo_predict",
+            "prediction_uid": uid,
+            "user_id": user_id,
+            "batch_id": batch_id,
+            **source,
+        }
+        if chat_id:
+            job["chat_id"] = chat_id
+        if callback_url:
+            job["callback_url"] = callback_url
+        jobs.append(job)
+
+    # The batch row must exist before any worker can finish one of its jobs
+    await asyncio.to_thread(save_prediction_batch, db, batch_id, user_id, len(jobs))
+
+    try:
+        await get_publisher().publish_jobs(jobs)
+    except Exception as exc:
+        await asyncio.to_thread(_remove_files, stored_paths)
+        print(f"[batch] failed to queue batch {batch_id}: {exc}")
+        raise HTTPException(status_code=503, detail="Prediction queue unavailable")
+
+    return {"batch_id": batch_id, "total": len(jobs), "prediction_uids": uids}
+
+
+@router.get("/predictions/batch/{batch_id}")
+def get_batch_status(
+    batch_id: str,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Progress of a batch from aggregate counts.
+    """
+    batch = query_prediction_batch(db, batch_id, user_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    completed, detections = query_batch_progress(db, batch_id)
+    return {
+        "batch_id": batch.id,
+        "created_at": batch.created_at,
+        "total": batch.total,
+        "completed": completed,
+        "pending": max(batch.total - completed, 0),
+        "detection_count": detections,
+        "done": completed >= batch.total,
+    }
@@ -1,60 +1,127 @@
 # controllers/images.py
 
+import asyncio
 import os
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from requests import Session
 
 from database.db import get_db
 from dependencies.auth import get_current_user_id
 from queries.queries import query_prediction_image_by_uid
+from services.file_responses import (
+    IMMUTABLE_CACHE_CONTROL,
+    PRIVATE_IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    conditional_file_response,
+    stat_file,
+)
+from services.image_variants import (
+    MAX_VARIANT_DIMENSION,
+    discard_variant,
+    get_resized_variant,
+    get_transcoded_variant,
+    negotiate_image_type,
+)
 
 router = APIRouter()
 
+UPLOADS_DIR = "uploads"
+
+
 @router.get("/image/{type}/{filename}")
-def get_image(type: str, filename: str):
+async def get_image(
+    type: str,
+    filename: str,
+    request: Request,
+    width: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_DIMENSION),
+    height: Optional[int] = Query(None, ge=1, le=MAX_VARIANT_DIMENSION),
+    quality: Optional[int] = Query(None, ge=1, le=95),
+):
     """
-    Get image by type and filename
+    Get image by type and filename.
+
+    Pass width/height (fit within, aspect kept) and/or quality to get a
+    cached resized variant instead of the full-resolution file.
     """
     if type not in ["original", "predicted"]:
         raise HTTPException(status_code=400, detail="Invalid image type")
-    
-    path = os.path.join("uploads", type, filename)
-    
-    if not os.path.exists(path):
+
+    path = os.path.join(UPLOADS_DIR, type, filename)
+
+    st = stat_file(path)
+    if st is None:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    return FileResponse(path)
+    cache_control = IMMUTABLE_CACHE_CONTROL if type == "predicted" else REVALIDATE_CACHE_CONTROL
+
+    if width is None and height is None and quality is None:
+        return conditional_file_response(request, path, st, cache_control=cache_control)
+
+    variant_path, variant_st = await _resized_variant(path, st, width, height, quality)
+    return conditional_file_response(
+        request, variant_path, variant_st, media_type="image/jpeg", cache_control=cache_control
+    )
+
+
+async def _resized_variant(path, st, width, height, quality):
+    # A cached file can be evicted between lookup and stat; regenerate once
+    for _ in range(2):
+        try:
+            variant_path = await get_resized_variant(path, st, width, height, quality)
+        except OSError:
+            raise HTTPException(status_code=415, detail="Image cannot be resized")
+        variant_st = stat_file(variant_path)
+        if variant_st is not None:
+            return variant_path, variant_st
+        discard_variant(variant_path)
+    raise HTTPException(status_code=503, detail="Image variant unavailable, retry")
 
 
 
 @router.get("/prediction/{uid}/image")
-def get_prediction_image(
+async def get_prediction_image(
     uid: str,
     request: Request,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """
-    Get prediction image by UID.
+    Get prediction image by UID, transcoded to the best type the client accepts
+    (AVIF, WebP, JPEG or PNG).
     """
     accept = request.headers.get("accept", "")
 
-    session = query_prediction_image_by_uid(db, uid, user_id)  # <-- Pass user_id
+    session = await asyncio.to_thread(query_prediction_image_by_uid, db, uid, user_id)  # <-- Pass user_id
     if not session:
         raise HTTPException(status_code=404, detail="Prediction not found")
 
     image_path = session.predicted_image
 
-    if not os.path.exists(image_path):
+    st = stat_file(image_path)
+    if st is None:
         raise HTTPException(status_code=404, detail="Predicted image file not found")
 
-    if "image/png" in accept:
-        return FileResponse(image_path, media_type="image/png")
-    elif "image/jpeg" in accept or "image/jpg" in accept:
-        return FileResponse(image_path, media_type="image/jpeg")
-    else:
+    media_type = negotiate_image_type(accept)
+    if media_type is None:
         raise HTTPException(
             status_code=406, detail="Client does not accept an image format"
         )
 
+    try:
+        served_path = await get_transcoded_variant(image_path, st, media_type)
+    except OSError:
+        raise HTTPException(status_code=415, detail="Image cannot be transcoded")
+    served_st = st if served_path == image_path else stat_file(served_path)
+    if served_st is None:
+        raise HTTPException(status_code=503, detail="Image variant unavailable, retry")
+
+    # Per-user content: shared caches must not store it, and it varies on Accept
+    return conditional_file_response(
+        request,
+        served_path,
+        served_st,
+        media_type=media_type,
+        cache_control=PRIVATE_IMMUTABLE_CACHE_CONTROL,
+        headers={"vary": "Accept"},
+    )
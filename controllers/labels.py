@@ -5,10 +5,13 @@ from requests import Session
 
 from database.db import get_db
 from queries.queries import query_unique_labels_last_week
+from services.cache import response_cache
 router = APIRouter()
 
 
 @router.get("/labels")
 def get_unique_labels_last_week(db: Session = Depends(get_db)):
-    labels = query_unique_labels_last_week(db)
+    labels = response_cache.get_or_set(
+        "labels:last_week", lambda: query_unique_labels_last_week(db)
+    )
     return {"labels": labels}
\ No newline at end of file
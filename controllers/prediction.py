@@ -1,8 +1,12 @@
+import asyncio
+import mimetypes
 import os
 import shutil
 import time
 import uuid
-from fastapi import APIRouter, Depends
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, Query, Request
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 import torch
@@ -13,7 +17,16 @@ from database.db import get_db
 from database.queries import get_detection_objects, get_prediction_session
 from dependencies.auth import get_current_user_id
 from models.models import DetectionObject, PredictionSession
-from queries.queries import query_sessions_by_label, save_detection_object, save_prediction_session
+from queries.queries import (
+    query_detection_objects_by_uids,
+    query_sessions_by_label,
+    query_sessions_by_uids,
+    save_detection_object,
+    save_prediction_session,
+)
+from services.amqp_publisher import get_publisher
+from services.prediction_stream import prediction_hub
+from services.uploads import MAX_UPLOAD_BYTES, UploadError, stream_multipart_upload, stream_raw_upload, upload_filename
 
 router = APIRouter()
 
@@ -21,6 +34,10 @@ UPLOAD_DIR = "uploads/original"
 PREDICTED_DIR = "uploads/predicted"
 DB_PATH = "predictions.db"
 CHATS_BASE_DIR = "uploads/chats"
+PREDICT_MAX_WAIT_SECONDS = float(os.getenv("PREDICT_MAX_WAIT_SECONDS", "30"))
+MAX_MULTI_GET = int(os.getenv("MAX_MULTI_GET", "200"))
+# Safety-net DB check interval while long-polling, in case an event is missed
+WAIT_FALLBACK_POLL_SECONDS = float(os.getenv("WAIT_FALLBACK_POLL_SECONDS", "5"))
 
 AWS_REGION = os.getenv("AWS_REGION")
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
@@ -34,26 +51,13 @@ torch.cuda.is_available = lambda: False
 
 
 """
-The synchronous POST /predict endpoint has been removed.
-
-Predictions are now handled asynchronously via RabbitMQ by the standalone
-worker in `receive.py`. This router continues to serve read-only endpoints
-for fetching prediction data.
+POST /predict only ingests: the image is streamed to disk (or referenced by
+S3 key), a job is queued on RabbitMQ and the prediction_uid is returned at
+once. Inference runs in the standalone worker in `receive.py`.
 """
-    
-    
-@router.get("/prediction/{uid}")
-def get_prediction_by_uid(
-    uid: str,
-    user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
-):
-    session = get_prediction_session(db, uid, user_id)
-    if not session:
-        raise HTTPException(status_code=401, detail="Unauthorized or prediction not found")
 
-    objects = get_detection_objects(db, uid)
 
+def _serialize_prediction(session, objects) -> Dict[str, Any]:
     return {
         "uid": session.uid,
         "timestamp": session.timestamp,
@@ -69,8 +73,175 @@ def get_prediction_by_uid(
             for obj in objects
         ],
     }
+
+
+def _load_prediction(db: Session, uid: str, user_id: int):
+    # End any open transaction so rows committed by the worker are visible
+    db.rollback()
+    session = get_prediction_session(db, uid, user_id)
+    if not session:
+        return None
+    return session, get_detection_objects(db, uid)
+
+
+async def _wait_for_prediction(db: Session, uid: str, user_id: int, timeout: float):
+    """Long-poll until the job lands or timeout passes.
+
+    Wakes on the images.processed event for uid instead of polling the DB;
+    the DB is read on wake-up and every WAIT_FALLBACK_POLL_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        found = await asyncio.to_thread(_load_prediction, db, uid, user_id)
+        if found:
+            return found
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await prediction_hub.wait_for(uid, min(remaining, WAIT_FALLBACK_POLL_SECONDS))
+
+
+@router.post("/predict")
+async def predict(
+    request: Request,
+    img: Optional[str] = Query(None, description="S3 key of an already uploaded image"),
+    chat_id: Optional[str] = Query(None),
+    callback_url: Optional[str] = Query(None),
+    wait: float = Query(0, ge=0, le=PREDICT_MAX_WAIT_SECONDS, description="Seconds to wait for the result"),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue an image for prediction and return its prediction_uid.
+
+    The image is a multipart 'file' part, a raw image/* body, or an S3 key
+    passed as 'img'. Bodies are streamed to disk, never buffered whole.
+    """
+    uid = str(uuid.uuid4())
+    content_type = request.headers.get("content-type", "")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+    job: Dict[str, Any] = {"type": "yolo_predict", "prediction_uid": uid, "user_id": user_id}
+    stored_path: Optional[str] = None
+    try:
+        if img:
+            job["img"] = img
+        elif content_type.startswith("multipart/form-data"):
+            stored_path, fields = await stream_multipart_upload(request.stream(), content_type, UPLOAD_DIR, uid)
+            chat_id = chat_id or fields.get("chat_id")
+            callback_url = callback_url or fields.get("callback_url")
+        elif content_type.startswith("image/"):
+            ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ".jpg"
+            stored_path = os.path.join(UPLOAD_DIR, upload_filename(f"upload{ext}", uid))
+            await stream_raw_upload(request.stream(), stored_path)
+        else:
+            raise HTTPException(status_code=415, detail="Send a multipart 'file', an image/* body, or 'img'")
+    except UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+    if stored_path:
+        job.update({"source": "path", "path": stored_path})
+    if chat_id:
+        job["chat_id"] = chat_id
+    if callback_url:
+        job["callback_url"] = callback_url
+
+    try:
+        await get_publisher().publish_job(job)
+    except Exception as exc:
+        if stored_path:
+            await asyncio.to_thread(_remove_file, stored_path)
+        print(f"[predict] failed to queue job {uid}: {exc}")
+        raise HTTPException(status_code=503, detail="Prediction queue unavailable")
+
+    if wait > 0:
+        found = await _wait_for_prediction(db, uid, user_id, wait)
+        if found:
+            session, objects = found
+            result = _serialize_prediction(session, objects)
+            result.update({
+                "prediction_uid": uid,
+                "status": "completed",
+                "labels": [obj.label for obj in objects],
+            })
+            return result
+
+    return {"prediction_uid": uid, "status": "queued"}
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@router.get("/prediction/{uid}")
+def get_prediction_by_uid(
+    uid: str,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    session = get_prediction_session(db, uid, user_id)
+    if not session:
+        raise HTTPException(status_code=401, detail="Unauthorized or prediction not found")
+
+    objects = get_detection_objects(db, uid)
+
+    return _serialize_prediction(session, objects)
     
     
+def _get_predictions_by_uids(db: Session, uids: List[str], user_id: int) -> Dict[str, Any]:
+    # Preserve request order, drop duplicates and blanks
+    uids = list(dict.fromkeys(uid for uid in uids if uid))
+    if not uids:
+        raise HTTPException(status_code=422, detail="Provide at least one uid")
+    if len(uids) > MAX_MULTI_GET:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_MULTI_GET} uids per request")
+
+    sessions = {session.uid: session for session in query_sessions_by_uids(db, uids, user_id)}
+    objects_by_uid = defaultdict(list)
+    if sessions:
+        # Only owned uids reach the detections query
+        for obj in query_detection_objects_by_uids(db, list(sessions)):
+            objects_by_uid[obj.prediction_uid].append(obj)
+
+    return {
+        "predictions": [
+            _serialize_prediction(sessions[uid], objects_by_uid[uid]) for uid in uids if uid in sessions
+        ],
+        "missing": [uid for uid in uids if uid not in sessions],
+    }
+
+
+@router.get("/predictions")
+def get_predictions_by_uids(
+    uids: List[str] = Query(..., description="Comma-separated or repeated prediction uids"),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Get several of the current user's predictions with their detections in two queries.
+    """
+    split = [uid.strip() for value in uids for uid in value.split(",")]
+    return _get_predictions_by_uids(db, split, user_id)
+
+
+@router.post("/predictions/query")
+def query_predictions_by_uids(
+    uids: List[str] = Body(..., embed=True),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Same as GET /predictions, with the uid list in a JSON body for long lists.
+    """
+    return _get_predictions_by_uids(db, [uid.strip() for uid in uids], user_id)
+
+
 @router.get("/predictions/label/{label}")
 def get_predictions_by_label(
     label: str,
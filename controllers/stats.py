@@ -6,6 +6,7 @@ from dependencies.auth import get_current_user_id
 from queries.queries import query_detection_objects_last_8_days, query_sessions_by_min_score, query_total_predictions_last_8_days
 from database.db import get_db  # make sure this is imported
 from queries.queries import query_prediction_count_last_week
+from services.cache import response_cache
 
 router = APIRouter()
 
@@ -33,7 +34,9 @@ def get_predictions_by_score(
 
 @router.get("/predictions/count")
 def get_prediction_count_last_week(db: Session = Depends(get_db)):
-    count = query_prediction_count_last_week(db)
+    count = response_cache.get_or_set(
+        "predictions:count:last_week", lambda: query_prediction_count_last_week(db)
+    )
     return {"count": count}
 
 
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from dependencies.auth import get_current_user_id, get_websocket_user_id
+from services.prediction_stream import prediction_hub
+
+router = APIRouter()
+
+KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "15"))
+RETRY_MILLISECONDS = 3000
+
+
+def _format_sse(event_id: str, payload) -> str:
+    return f"id: {event_id}\nevent: prediction\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.get("/predictions/stream")
+async def stream_predictions(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events stream of the current user's completed predictions.
+
+    Reconnecting clients send Last-Event-ID to receive what they missed.
+    """
+    queue, replay = prediction_hub.subscribe(user_id, last_event_id)
+
+    async def events():
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            for event_id, payload in replay:
+                yield _format_sse(event_id, payload)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield _format_sse(*event)
+        finally:
+            prediction_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+    )
+
+
+@router.websocket("/ws/predictions")
+async def websocket_predictions(
+    websocket: WebSocket,
+    user_id: int = Depends(get_websocket_user_id),
+    last_event_id: Optional[str] = Query(None),
+):
+    """
+    WebSocket variant of /predictions/stream; each message is {"id", "event"}.
+    """
+    await websocket.accept()
+    queue, replay = prediction_hub.subscribe(user_id, last_event_id)
+
+    async def client_gone() -> None:
+        # Nothing is expected from the client; this only notices disconnects
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    gone = asyncio.ensure_future(client_gone())
+    try:
+        for event_id, payload in replay:
+            await websocket.send_json({"id": event_id, "event": payload})
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait({next_event, gone}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            event = next_event.result()
+            if event is None:
+                await websocket.close(code=1013)  # try again later: client fell behind
+                break
+            event_id, payload = event
+            await websocket.send_json({"id": event_id, "event": payload})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        gone.cancel()
+        prediction_hub.unsubscribe(user_id, queue)
@@ -1,7 +1,7 @@
 
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 load_dotenv()
 
@@ -31,6 +31,25 @@ def get_db():
     finally:
         db.close()
         
+def _add_missing_columns():
+    """create_all() never alters existing tables; add nullable columns introduced since."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                for index in table.indexes:
+                    if column in index.columns:
+                        index.create(conn, checkfirst=True)
+
+
 def init_db():
     print(f"Creating tables for {DB_BACKEND}...")
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
\ No newline at end of file
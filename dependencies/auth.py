@@ -1,6 +1,9 @@
 # dependencies/auth.py
 
-from fastapi import Depends, HTTPException, status, Request
+import base64
+import binascii
+
+from fastapi import Depends, HTTPException, status, Request, WebSocket, WebSocketException
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from typing import Optional
 from sqlalchemy.orm import Session
@@ -26,6 +29,28 @@ def get_current_user_id(
     credentials: Optional[HTTPBasicCredentials] = Depends(security),
     db: Session = Depends(get_db)
 ):
+    return authenticate(db, credentials)
+
+
+def get_websocket_user_id(websocket: WebSocket, db: Session = Depends(get_db)):
+    """Same rules as get_current_user_id, reading Basic credentials from the handshake."""
+    authorization = websocket.headers.get("authorization", "")
+    scheme, _, param = authorization.partition(" ")
+    credentials = None
+    if authorization and scheme.lower() == "basic":
+        try:
+            decoded = base64.b64decode(param, validate=True).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid credentials.")
+        username, _, password = decoded.partition(":")
+        credentials = HTTPBasicCredentials(username=username, password=password)
+    try:
+        return authenticate(db, credentials)
+    except HTTPException as exc:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
+
+
+def authenticate(db: Session, credentials: Optional[HTTPBasicCredentials]):
     if credentials is None or (not credentials.username and not credentials.password):
         return ensure_anonymous_user(db)
 
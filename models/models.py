@@ -13,6 +13,7 @@ class PredictionSession(Base):
     original_image = Column(String)
     predicted_image = Column(String)
     user_id = Column(Integer, ForeignKey('users.id'))
+    batch_id = Column(String, index=True, nullable=True)
 
     detections = relationship("DetectionObject", back_populates="session")
 
@@ -35,3 +36,12 @@ class User(Base):
     password = Column(String, nullable=False)
 
     predictions = relationship("PredictionSession", backref="user")
+
+
+class PredictionBatch(Base):
+    __tablename__ = 'prediction_batches'
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    total = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -4,14 +4,15 @@ from typing import Counter
 from sqlalchemy import func
 from models.models import PredictionSession
 from sqlalchemy.orm import Session
-from models.models import DetectionObject
+from models.models import DetectionObject, PredictionBatch
 
-def save_prediction_session(db: Session, uid: str, original_image: str, predicted_image: str, user_id: int):
+def save_prediction_session(db: Session, uid: str, original_image: str, predicted_image: str, user_id: int, batch_id: str = None):
     session = PredictionSession(
         uid=uid,
         original_image=original_image,
         predicted_image=predicted_image,
-        user_id=user_id
+        user_id=user_id,
+        batch_id=batch_id,
     )
     db.add(session)
     db.commit()
@@ -114,3 +115,48 @@ def query_detection_objects_last_8_days(db: Session, user_id: int, time_threshol
         )
         .all()
     )
+
+
+
+def save_prediction_batch(db: Session, batch_id: str, user_id: int, total: int):
+    batch = PredictionBatch(id=batch_id, user_id=user_id, total=total)
+    db.add(batch)
+    db.commit()
+    db.refresh(batch)
+    return batch
+
+
+def query_prediction_batch(db: Session, batch_id: str, user_id: int):
+    return db.query(PredictionBatch).filter_by(id=batch_id, user_id=user_id).first()
+
+
+def query_batch_progress(db: Session, batch_id: str):
+    """Completed predictions and total detections for a batch in one aggregate query."""
+    completed, detections = (
+        db.query(
+            func.count(func.distinct(PredictionSession.uid)),
+            func.count(DetectionObject.id),
+        )
+        .select_from(PredictionSession)
+        .outerjoin(DetectionObject, DetectionObject.prediction_uid == PredictionSession.uid)
+        .filter(PredictionSession.batch_id == batch_id)
+        .one()
+    )
+    return completed, detections
+
+
+def query_sessions_by_uids(db: Session, uids, user_id: int):
+    return (
+        db.query(PredictionSession)
+        .filter(PredictionSession.uid.in_(uids), PredictionSession.user_id == user_id)
+        .all()
+    )
+
+
+def query_detection_objects_by_uids(db: Session, uids):
+    return (
+        db.query(DetectionObject)
+        .filter(DetectionObject.prediction_uid.in_(uids))
+        .order_by(DetectionObject.id)
+        .all()
+    )
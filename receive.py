@@ -127,6 +127,7 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
                 original_image=original_path,
                 predicted_image=predicted_path,
                 user_id=effective_user_id,
+                batch_id=data.get("batch_id"),
             )
             for det in detections:
                 save_detection_object(
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+# Entries younger than this survive event invalidation, so a burst of
+# images.processed events cannot turn every dashboard poll into a DB hit.
+CACHE_INVALIDATE_MIN_AGE = float(os.getenv("CACHE_INVALIDATE_MIN_AGE", "1"))
+# Optional shared backend, e.g. redis://localhost:6379/0
+CACHE_URL = os.getenv("CACHE_URL")
+
+_MISSING = object()
+
+
+class InMemoryBackend:
+    """Process-local backend with per-entry TTL and an LRU size bound.
+
+    Also serves as the local stand-in for the shared backend in tests and
+    single-node deployments.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        """Return (value, stored_at) or (_MISSING, 0) when absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING, 0.0
+            expires_at, stored_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING, 0.0
+            self._entries.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, min_age: float = 0.0) -> None:
+        cutoff = time.monotonic() - min_age
+        with self._lock:
+            for key in [k for k, (_, stored_at, _) in self._entries.items() if stored_at <= cutoff]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared backend so several API processes see the same entries.
+
+    Values must be JSON serialisable. Requires the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, namespace: str = "yolo:cache:") -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed") from exc
+        self._client = redis.Redis.from_url(url)
+        self._namespace = namespace
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        raw = self._client.get(self._namespace + key)
+        if raw is None:
+            return _MISSING, 0.0
+        stored_at, value = json.loads(raw)
+        # Wall clock here: monotonic clocks are not comparable across hosts
+        return value, time.monotonic() - (time.time() - stored_at)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(self._namespace + key, json.dumps([time.time(), value]), px=int(ttl * 1000))
+
+    def invalidate(self, min_age: float = 0.0) -> None:
+        cutoff = time.time() - min_age
+        for raw_key in self._client.scan_iter(match=self._namespace + "*"):
+            raw = self._client.get(raw_key)
+            if raw is not None and json.loads(raw)[0] <= cutoff:
+                self._client.delete(raw_key)
+
+    def clear(self) -> None:
+        for raw_key in self._client.scan_iter(match=self._namespace + "*"):
+            self._client.delete(raw_key)
+
+
+class ResponseCache:
+    """Two-tier TTL cache for responses that are identical for every caller.
+
+    Lookups hit the in-process tier first, then the optional shared tier, and
+    only then compute the value. Concurrent misses for the same key compute it
+    once.
+    """
+
+    def __init__(self, local: InMemoryBackend, shared=None, ttl: float = CACHE_TTL_SECONDS) -> None:
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key: str) -> Any:
+        value, _ = self.local.get(key)
+        if value is not _MISSING:
+            return value
+        if self.shared is not None:
+            value, stored_at = self.shared.get(key)
+            if value is not _MISSING:
+                # Keep the shared entry's age so both tiers expire together
+                remaining = self.ttl - (time.monotonic() - stored_at)
+                if remaining > 0:
+                    self.local.set(key, value, remaining)
+                return value
+        return _MISSING
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        with self._lock_for(key):
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = compute()
+            effective_ttl = self.ttl if ttl is None else ttl
+            self.local.set(key, value, effective_ttl)
+            if self.shared is not None:
+                self.shared.set(key, value, effective_ttl)
+            return value
+
+    def invalidate(self, min_age: float = CACHE_INVALIDATE_MIN_AGE) -> None:
+        self.local.invalidate(min_age)
+        if self.shared is not None:
+            self.shared.invalidate(min_age)
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def handle_event(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        """Event listener hook: new predictions make global aggregates stale."""
+        if routing_key == "images.processed":
+            self.invalidate()
+
+
+response_cache = ResponseCache(
+    local=InMemoryBackend(),
+    shared=RedisBackend(CACHE_URL) if CACHE_URL else None,
+)
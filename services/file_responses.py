@@ -0,0 +1,92 @@
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+
+# Predicted artifacts are written once under a uid-suffixed name and never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRIVATE_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def stat_file(path: str) -> Optional[os.stat_result]:
+    """Single stat per request; replaces the separate os.path.exists check.
+
+    Returns None when the path is missing or is not a regular file.
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return st
+
+
+def make_etag(st: os.stat_result) -> str:
+    """Strong validator: any rewrite changes the mtime or the size."""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    if header_value.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        # HTTP dates have one-second resolution
+        return int(st.st_mtime) <= since.timestamp()
+    return False
+
+
+def conditional_file_response(
+    request: Request,
+    path: str,
+    st: os.stat_result,
+    media_type: Optional[str] = None,
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serve a file with ETag/Last-Modified, answering 304 when the client is current.
+
+    Range and If-Range requests are handled by Starlette's FileResponse using
+    the validators set here.
+    """
+    etag = make_etag(st)
+    response_headers = {
+        "etag": etag,
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "cache-control": cache_control,
+    }
+    if headers:
+        response_headers.update(headers)
+
+    if is_not_modified(request, etag, st):
+        return Response(status_code=304, headers=response_headers)
+
+    return FileResponse(path, media_type=media_type, headers=response_headers, stat_result=st)
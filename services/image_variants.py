@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+
+VARIANT_CACHE_DIR = os.getenv("VARIANT_CACHE_DIR", "uploads/variants")
+VARIANT_CACHE_MAX_BYTES = int(os.getenv("VARIANT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+MAX_VARIANT_DIMENSION = int(os.getenv("MAX_VARIANT_DIMENSION", "2048"))
+DEFAULT_VARIANT_QUALITY = int(os.getenv("DEFAULT_VARIANT_QUALITY", "80"))
+WEBP_QUALITY = int(os.getenv("WEBP_QUALITY", "80"))
+# AVIF reaches JPEG-80 fidelity at a lower nominal quality
+AVIF_QUALITY = int(os.getenv("AVIF_QUALITY", "60"))
+
+# Pillow format name and file extension per output media type
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "image/jpeg": ("JPEG", ".jpg"),
+    "image/png": ("PNG", ".png"),
+}
+if features.check("webp"):
+    FORMATS["image/webp"] = ("WEBP", ".webp")
+if features.check("avif"):
+    FORMATS["image/avif"] = ("AVIF", ".avif")
+
+TRANSCODE_QUALITY = {
+    "image/jpeg": DEFAULT_VARIANT_QUALITY,
+    "image/png": DEFAULT_VARIANT_QUALITY,
+    "image/webp": WEBP_QUALITY,
+    "image/avif": AVIF_QUALITY,
+}
+
+# Server preference when the client weights several types equally: smallest first
+PREFERRED_TYPES = [t for t in ("image/avif", "image/webp", "image/jpeg", "image/png") if t in FORMATS]
+
+
+class DiskLRUCache:
+    """Size-capped directory of generated files with least-recently-used eviction.
+
+    The index lives in memory and is rebuilt from the directory (oldest mtime
+    first) on first use, so a restarted process keeps the files it already
+    paid for.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._index: "Optional[OrderedDict[str, int]]" = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            os.makedirs(self.root, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.is_file() and not entry.name.startswith("."):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self.total_bytes = sum(self._index.values())
+        return self._index
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            index = self._load()
+            if name not in index:
+                return None
+            index.move_to_end(name)
+            return self.path_for(name)
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            size = self._load().pop(name, None)
+            if size is not None:
+                self.total_bytes -= size
+
+    def temp_path(self) -> str:
+        """A scratch file inside the cache dir so put() is an atomic rename."""
+        with self._lock:
+            self._load()
+        fd, path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        os.close(fd)
+        return path
+
+    def put(self, name: str, tmp_path: str) -> str:
+        final_path = self.path_for(name)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, final_path)
+        with self._lock:
+            index = self._load()
+            self.total_bytes -= index.pop(name, 0)
+            index[name] = size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(index) > 1:
+                victim, victim_size = index.popitem(last=False)
+                self.total_bytes -= victim_size
+                try:
+                    os.remove(self.path_for(victim))
+                except FileNotFoundError:
+                    pass
+        return final_path
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls for the same key into one execution.
+
+    The work runs as its own task, so a caller that disconnects does not
+    cancel it for the others still waiting.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+variant_cache = DiskLRUCache(VARIANT_CACHE_DIR, VARIANT_CACHE_MAX_BYTES)
+_single_flight = SingleFlight()
+
+
+def render_variant(
+    src_path: str,
+    dest_path: str,
+    width: Optional[int],
+    height: Optional[int],
+    quality: int,
+    media_type: str,
+) -> None:
+    """Resize within width x height (aspect kept, never upscaled) and encode.
+
+    With neither dimension set the image is only re-encoded.
+    """
+    pil_format, _ = FORMATS[media_type]
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if width or height:
+            img.thumbnail(
+                (width or MAX_VARIANT_DIMENSION, height or MAX_VARIANT_DIMENSION),
+                Image.Resampling.LANCZOS,
+            )
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(dest_path, format=pil_format, quality=quality, optimize=True)
+
+
+def variant_name(
+    src_path: str,
+    st: os.stat_result,
+    width: Optional[int],
+    height: Optional[int],
+    quality: int,
+    media_type: str,
+) -> str:
+    # Source mtime and size are part of the key, so a rewritten source misses
+    raw = f"{os.path.abspath(src_path)}|{st.st_mtime_ns}|{st.st_size}|{width}|{height}|{quality}|{media_type}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest() + FORMATS[media_type][1]
+
+
+def discard_variant(path: str) -> None:
+    """Forget a cached variant whose file has gone missing."""
+    variant_cache.discard(os.path.basename(path))
+
+
+async def get_resized_variant(
+    src_path: str,
+    st: os.stat_result,
+    width: Optional[int],
+    height: Optional[int],
+    quality: Optional[int] = None,
+    media_type: str = "image/jpeg",
+) -> str:
+    """Return the path of a cached resized variant, generating it off the event loop once."""
+    quality = quality or DEFAULT_VARIANT_QUALITY
+    name = variant_name(src_path, st, width, height, quality, media_type)
+
+    cached = variant_cache.get(name)
+    if cached is not None:
+        return cached
+
+    async def _generate() -> str:
+        def _work() -> str:
+            tmp_path = variant_cache.temp_path()
+            try:
+                render_variant(src_path, tmp_path, width, height, quality, media_type)
+                return variant_cache.put(name, tmp_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+
+        return await asyncio.to_thread(_work)
+
+    return await _single_flight.run(name, _generate)
+
+
+def _parse_accept(accept: str) -> List[Tuple[str, float]]:
+    ranges: List[Tuple[str, float]] = []
+    for part in accept.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        media_range = fields[0].lower()
+        if not media_range:
+            continue
+        if media_range == "image/jpg":
+            media_range = "image/jpeg"
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range, q))
+    return ranges
+
+
+def negotiate_image_type(accept: str) -> Optional[str]:
+    """Pick the output media type for an Accept header, or None if nothing fits.
+
+    The most specific matching range sets each candidate's q; ties go to the
+    smaller encoding. A missing header accepts anything.
+    """
+    ranges = _parse_accept(accept or "*/*")
+    best: Optional[str] = None
+    best_q = 0.0
+    for candidate in PREFERRED_TYPES:
+        q = None
+        specificity = -1
+        for media_range, range_q in ranges:
+            if media_range == candidate:
+                level = 2
+            elif media_range == "image/*":
+                level = 1
+            elif media_range == "*/*":
+                level = 0
+            else:
+                continue
+            if level > specificity:
+                specificity, q = level, range_q
+        if q is not None and q > best_q:
+            best, best_q = candidate, q
+    return best
+
+
+def transcode_sidecar_path(src_path: str, media_type: str) -> str:
+    return os.path.splitext(src_path)[0] + FORMATS[media_type][1]
+
+
+async def get_transcoded_variant(src_path: str, st: os.stat_result, media_type: str) -> str:
+    """Return src_path re-encoded as media_type, cached as a sidecar next to it.
+
+    Sidecars older than the source are regenerated. The source itself is
+    returned when it already has the requested type.
+    """
+    if mimetypes.guess_type(src_path)[0] == media_type:
+        return src_path
+    dest_path = transcode_sidecar_path(src_path, media_type)
+    try:
+        if os.stat(dest_path).st_mtime_ns >= st.st_mtime_ns:
+            return dest_path
+    except FileNotFoundError:
+        pass
+
+    async def _generate() -> str:
+        def _work() -> str:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path) or ".", prefix=".tmp-")
+            os.close(fd)
+            try:
+                render_variant(src_path, tmp_path, None, None, TRANSCODE_QUALITY[media_type], media_type)
+                os.replace(tmp_path, dest_path)
+                return dest_path
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+
+        return await asyncio.to_thread(_work)
+
+    return await _single_flight.run(dest_path, _generate)
@@ -0,0 +1,104 @@
+import asyncio
+import itertools
+import os
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+
+REPLAY_BUFFER_SIZE = int(os.getenv("STREAM_REPLAY_BUFFER_SIZE", "100"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("STREAM_SUBSCRIBER_QUEUE_SIZE", "256"))
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class PredictionEventHub:
+    """In-memory, per-user fan-out of images.processed events to connected clients.
+
+    Event ids are '<boot>:<seq>', where boot identifies this process. A
+    client resuming with an id from this process gets only newer events;
+    an id from another process (or a restart) replays the whole buffer, so
+    clients should dedupe on prediction_uid.
+    """
+
+    def __init__(self, replay_size: int = REPLAY_BUFFER_SIZE, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.boot = uuid.uuid4().hex[:8]
+        self.replay_size = replay_size
+        self.queue_size = queue_size
+        self._seq = itertools.count(1)
+        self._history: Dict[int, Deque[Tuple[int, Event]]] = defaultdict(lambda: deque(maxlen=self.replay_size))
+        self._subscribers: Dict[int, Set["asyncio.Queue[Optional[Event]]"]] = defaultdict(set)
+        self._waiters: Dict[str, List["asyncio.Future[Dict[str, Any]]"]] = defaultdict(list)
+
+    def publish(self, payload: Dict[str, Any]) -> Optional[str]:
+        uid = payload.get("prediction_uid")
+        for waiter in self._waiters.pop(uid, []) if uid else []:
+            if not waiter.done():
+                waiter.set_result(payload)
+
+        user_id = payload.get("user_id")
+        if user_id is None:
+            return None
+        user_id = int(user_id)
+        seq = next(self._seq)
+        event_id = f"{self.boot}:{seq}"
+        event = (event_id, payload)
+        self._history[user_id].append((seq, event))
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client must not hold memory; it resumes via Last-Event-ID
+                self._drop(user_id, queue)
+        return event_id
+
+    def handle_event(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        """Event listener hook."""
+        if routing_key == "images.processed":
+            self.publish(payload)
+
+    def subscribe(self, user_id: int, last_event_id: Optional[str] = None):
+        """Return (queue, events to replay). A None on the queue means the subscriber was dropped."""
+        queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue, self._replay(user_id, last_event_id)
+
+    def unsubscribe(self, user_id: int, queue: "asyncio.Queue[Optional[Event]]") -> None:
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def _drop(self, user_id: int, queue: "asyncio.Queue[Optional[Event]]") -> None:
+        self.unsubscribe(user_id, queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _replay(self, user_id: int, last_event_id: Optional[str]) -> List[Event]:
+        if not last_event_id:
+            return []
+        history = self._history.get(user_id, ())
+        boot, _, seq = last_event_id.partition(":")
+        if boot != self.boot or not seq.isdigit():
+            return [event for _, event in history]
+        return [event for event_seq, event in history if event_seq > int(seq)]
+
+    async def wait_for(self, prediction_uid: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait until the event for prediction_uid arrives, or None on timeout."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[prediction_uid].append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(prediction_uid)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[prediction_uid]
+
+
+prediction_hub = PredictionEventHub()
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import re
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_FIELD_BYTES = 64 * 1024
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+UPLOAD_FIELD_NAME = "file"
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def upload_filename(client_filename: Optional[str], uid: str) -> str:
+    """Safe on-disk name following the worker's '<name>-<uid><ext>' convention."""
+    base = os.path.basename(client_filename or "")
+    stem, ext = os.path.splitext(base)
+    ext = ext.lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        ext = ".jpg"
+    stem = re.sub(r"[^A-Za-z0-9_.-]", "_", stem)[:64] or "upload"
+    return f"{stem}-{uid}{ext}"
+
+
+class _FileSink:
+    """Writes chunks to disk off the event loop."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.size = 0
+        self._file = None
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > MAX_UPLOAD_BYTES:
+            raise UploadError(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        if self._file is None:
+            self._file = await asyncio.to_thread(open, self.path, "wb")
+        await asyncio.to_thread(self._file.write, data)
+
+    async def close(self) -> None:
+        if self._file is not None and not self._file.closed:
+            await asyncio.to_thread(self._file.close)
+
+    async def discard(self) -> None:
+        await self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def stream_raw_upload(stream: AsyncIterator[bytes], dest_path: str) -> int:
+    """Copy a raw image request body to dest_path chunk by chunk."""
+    sink = _FileSink(dest_path)
+    try:
+        async for chunk in stream:
+            if chunk:
+                await sink.write(chunk)
+    except BaseException:
+        await sink.discard()
+        raise
+    await sink.close()
+    if sink.size == 0:
+        await sink.discard()
+        raise UploadError(400, "Empty upload")
+    return sink.size
+
+
+async def stream_multipart_upload(
+    stream: AsyncIterator[bytes],
+    content_type: str,
+    dest_dir: str,
+    uid: str,
+) -> Tuple[str, Dict[str, str]]:
+    """Parse a multipart body incrementally, writing the 'file' part straight to disk.
+
+    Only the current network chunk is held in memory. Returns the stored
+    path and the small text fields sent alongside the file.
+    """
+    paths, fields = await stream_multipart_uploads(
+        stream, content_type, lambda filename: os.path.join(dest_dir, upload_filename(filename, uid)), max_files=1
+    )
+    return paths[0], fields
+
+
+async def stream_multipart_uploads(
+    stream: AsyncIterator[bytes],
+    content_type: str,
+    path_for: Callable[[str], str],
+    max_files: int,
+) -> Tuple[List[str], Dict[str, str]]:
+    """Like stream_multipart_upload, for up to max_files 'file' parts.
+
+    path_for(client_filename) chooses where each part is written. On any
+    error every file written so far is removed.
+    """
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadError(400, "Missing multipart boundary")
+
+    fields: Dict[str, str] = {}
+    # (sink, data) in arrival order; data None marks the end of that part
+    pending: List[Tuple[_FileSink, Optional[bytes]]] = []
+    state: Dict[str, object] = {"headers": {}, "field": b"", "value": b"", "name": None, "is_file": False}
+    field_buffer = bytearray()
+    sinks: List[_FileSink] = []
+
+    def on_part_begin() -> None:
+        state["headers"] = {}
+        state["name"] = None
+        state["is_file"] = False
+        field_buffer.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        state["headers"][state["field"].lower()] = state["value"]
+        state["field"] = b""
+        state["value"] = b""
+
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = disposition.get(b"name", b"").decode("utf-8", "replace")
+        state["name"] = name
+        if name == UPLOAD_FIELD_NAME and b"filename" in disposition:
+            if len(sinks) >= max_files:
+                raise UploadError(400, f"At most {max_files} file(s) per request")
+            filename = disposition[b"filename"].decode("utf-8", "replace")
+            sinks.append(_FileSink(path_for(filename)))
+            state["is_file"] = True
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if state["is_file"]:
+            pending.append((sinks[-1], data[start:end]))
+        else:
+            field_buffer.extend(data[start:end])
+            if len(field_buffer) > MAX_FIELD_BYTES:
+                raise UploadError(413, "Form field too large")
+
+    def on_part_end() -> None:
+        if state["is_file"]:
+            pending.append((sinks[-1], None))
+        elif state["name"]:
+            fields[state["name"]] = field_buffer.decode("utf-8", "replace")
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    async def flush() -> None:
+        # One write per part per network chunk
+        items = pending[:]
+        pending.clear()
+        current: Optional[_FileSink] = None
+        buffered: List[bytes] = []
+        for sink, data in items:
+            if sink is not current:
+                if buffered:
+                    await current.write(b"".join(buffered))
+                    buffered = []
+                current = sink
+            if data is None:
+                if buffered:
+                    await sink.write(b"".join(buffered))
+                    buffered = []
+                await sink.close()
+            else:
+                buffered.append(data)
+        if buffered:
+            await current.write(b"".join(buffered))
+
+    try:
+        async for chunk in stream:
+            parser.write(chunk)
+            if pending:
+                await flush()
+        parser.finalize()
+        if pending:
+            await flush()
+    except BaseException as exc:
+        for sink in sinks:
+            await sink.discard()
+        if isinstance(exc, UploadError):
+            raise
+        if isinstance(exc, Exception):
+            raise UploadError(400, f"Malformed multipart body: {exc}") from exc
+        raise
+
+    if not sinks:
+        raise UploadError(400, f"Missing '{UPLOAD_FIELD_NAME}' file part")
+    for sink in sinks:
+        await sink.close()
+    if any(sink.size == 0 for sink in sinks):
+        for sink in sinks:
+            await sink.discard()
+        raise UploadError(400, "Empty upload")
+    return [sink.path for sink in sinks], fields
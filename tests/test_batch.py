@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import app
+from database.db import Base, get_db
+from dependencies.auth import get_current_user_id
+from queries.queries import save_detection_object, save_prediction_session
+
+
+class TestBatchEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmpdir.name, 'batch.db')}", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        self.SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user_id] = lambda: 5
+        self.publisher = MagicMock()
+        self.publisher.publish_jobs = AsyncMock(side_effect=lambda jobs: len(jobs))
+        self.patches = [
+            patch("controllers.batch.get_publisher", return_value=self.publisher),
+            patch("controllers.batch.UPLOAD_DIR", self.tmpdir.name),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        app.dependency_overrides = {}
+        self.tmpdir.cleanup()
+
+    def test_submit_keys_and_report_progress(self):
+        response = self.client.post("/predictions/batch", json={"keys": ["a.jpg", "b.jpg", "c.jpg"], "chat_id": "c1"})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        batch_id = body["batch_id"]
+        self.assertEqual(body["total"], 3)
+        self.publisher.publish_jobs.assert_awaited_once()
+        jobs = self.publisher.publish_jobs.await_args.args[0]
+        self.assertEqual([job["img"] for job in jobs], ["a.jpg", "b.jpg", "c.jpg"])
+        self.assertTrue(all(job["batch_id"] == batch_id and job["user_id"] == 5 for job in jobs))
+        self.assertEqual([job["prediction_uid"] for job in jobs], body["prediction_uids"])
+
+        # Worker completes one job with two detections
+        db = self.SessionLocal()
+        uid = body["prediction_uids"][0]
+        save_prediction_session(db, uid, "o.jpg", "p.jpg", 5, batch_id=batch_id)
+        save_detection_object(db, uid, "dog", 0.9, "[]")
+        save_detection_object(db, uid, "cat", 0.8, "[]")
+        db.close()
+
+        status = self.client.get(f"/predictions/batch/{batch_id}").json()
+        self.assertEqual(status["completed"], 1)
+        self.assertEqual(status["pending"], 2)
+        self.assertEqual(status["detection_count"], 2)
+        self.assertFalse(status["done"])
+
+    def test_multipart_uploads(self):
+        files = [("file", ("one.jpg", b"111", "image/jpeg")), ("file", ("two.png", b"2222", "image/png"))]
+        response = self.client.post("/predictions/batch", files=files)
+
+        self.assertEqual(response.status_code, 200)
+        jobs = self.publisher.publish_jobs.await_args.args[0]
+        self.assertEqual(len(jobs), 2)
+        with open(jobs[1]["path"], "rb") as f:
+            self.assertEqual(f.read(), b"2222")
+        self.assertTrue(jobs[0]["path"].endswith(f"one-{jobs[0]['prediction_uid']}.jpg"))
+
+    def test_rejects_oversized_batch(self):
+        with patch("controllers.batch.MAX_BATCH_SIZE", 2):
+            response = self.client.post("/predictions/batch", json={"keys": ["a", "b", "c"]})
+        self.assertEqual(response.status_code, 413)
+
+    def test_status_is_owner_scoped(self):
+        batch_id = self.client.post("/predictions/batch", json={"keys": ["a"]}).json()["batch_id"]
+        app.dependency_overrides[get_current_user_id] = lambda: 6
+
+        response = self.client.get(f"/predictions/batch/{batch_id}")
+
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from app import app
+from database.db import get_db
+from dependencies.auth import get_current_user_id
+
+
+class TestConditionalImageRequests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.uploads = self.tmpdir.name
+        os.makedirs(os.path.join(self.uploads, "predicted"))
+        self.content = bytes(range(256)) * 4
+        self.filename = "cat-uid1.jpg"
+        self.path = os.path.join(self.uploads, "predicted", self.filename)
+        with open(self.path, "wb") as f:
+            f.write(self.content)
+        self.uploads_patch = patch("controllers.image.UPLOADS_DIR", self.uploads)
+        self.uploads_patch.start()
+
+    def tearDown(self):
+        self.uploads_patch.stop()
+        self.tmpdir.cleanup()
+        app.dependency_overrides = {}
+
+    def test_validators_and_immutable_cache_control(self):
+        response = self.client.get(f"/image/predicted/{self.filename}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertTrue(response.headers["etag"].startswith('"'))
+        self.assertIn("last-modified", response.headers)
+        self.assertIn("immutable", response.headers["cache-control"])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(f"/image/predicted/{self.filename}").headers["etag"]
+
+        response = self.client.get(f"/image/predicted/{self.filename}", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(f"/image/predicted/{self.filename}").headers["last-modified"]
+
+        fresh = self.client.get(f"/image/predicted/{self.filename}", headers={"If-Modified-Since": last_modified})
+        stale = self.client.get(
+            f"/image/predicted/{self.filename}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+        )
+
+        self.assertEqual(fresh.status_code, 304)
+        self.assertEqual(stale.status_code, 200)
+
+    def test_etag_changes_when_file_is_rewritten(self):
+        etag = self.client.get(f"/image/predicted/{self.filename}").headers["etag"]
+        with open(self.path, "ab") as f:
+            f.write(b"more")
+
+        response = self.client.get(f"/image/predicted/{self.filename}", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_byte_range(self):
+        response = self.client.get(f"/image/predicted/{self.filename}", headers={"Range": "bytes=10-19"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[10:20])
+        self.assertEqual(response.headers["content-range"], f"bytes 10-19/{len(self.content)}")
+
+    def test_if_range_mismatch_sends_full_body(self):
+        response = self.client.get(
+            f"/image/predicted/{self.filename}", headers={"Range": "bytes=0-9", "If-Range": '"stale"'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+
+    @patch("controllers.image.query_prediction_image_by_uid")
+    def test_prediction_image_is_private_and_varies_on_accept(self, mock_query):
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        mock_query.return_value = MagicMock(predicted_image=self.path)
+
+        first = self.client.get("/prediction/uid1/image", headers={"Accept": "image/jpeg"})
+        second = self.client.get(
+            "/prediction/uid1/image", headers={"Accept": "image/jpeg", "If-None-Match": first.headers["etag"]}
+        )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers["cache-control"].startswith("private"))
+        self.assertEqual(first.headers["vary"], "Accept")
+        self.assertEqual(second.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
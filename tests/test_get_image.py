@@ -1,10 +1,11 @@
 import unittest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, mock_open, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 from app import app
 import sys
 import os
 
+FAKE_STAT = os.stat_result((0o100644, 0, 0, 1, 0, 0, 15, 0, 1700000000, 0))
 
 
 class TestImageEndpoints(unittest.TestCase):
@@ -16,12 +17,12 @@ class TestImageEndpoints(unittest.TestCase):
         self.image_path = f"uploads/original/{self.image_filename}"
         self.predicted_image_path = f"uploads/predicted/{self.image_filename}"
 
-    @patch("controllers.image.os.path.exists", return_value=True)
-    @patch("controllers.image.FileResponse")
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
+    @patch("controllers.image.conditional_file_response")
     def test_get_image_by_type_success(self, mock_file_response, mock_exists):
         print(f"\n=== Testing get_image_by_type_success ===")
         
-        # Mock FileResponse to return our expected response
+        # Mock the file response to return our expected response
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.content = self.image_data
@@ -30,8 +31,8 @@ class TestImageEndpoints(unittest.TestCase):
         response = self.client.get(f"/image/original/{self.image_filename}")
         
         print(f"Response status: {response.status_code}")
-        print(f"os.path.exists called with: {mock_exists.call_args_list}")
-        print(f"FileResponse called with: {mock_file_response.call_args_list}")
+        print(f"stat_file called with: {mock_exists.call_args_list}")
+        print(f"conditional_file_response called with: {mock_file_response.call_args_list}")
         
         if response.status_code != 200:
             print(f"Response text: {response.text}")
@@ -39,13 +40,13 @@ class TestImageEndpoints(unittest.TestCase):
         # Verify the path was constructed correctly
         expected_path = os.path.join("uploads", "original", self.image_filename)
         mock_exists.assert_called_with(expected_path)
-        mock_file_response.assert_called_with(expected_path)
+        self.assertEqual(mock_file_response.call_args.args[1:3], (expected_path, FAKE_STAT))
         
         self.assertEqual(response.status_code, 200)
 
-    @patch("controllers.image.os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("controllers.image.FileResponse")
+    @patch("controllers.image.conditional_file_response")
     def test_get_prediction_image_success(self, mock_file_response, mock_query, mock_exists):
         print(f"\n=== Testing get_prediction_image_success ===")
         
@@ -54,7 +55,7 @@ class TestImageEndpoints(unittest.TestCase):
         mock_session.predicted_image = self.predicted_image_path
         mock_query.return_value = mock_session
         
-        # Mock FileResponse
+        # Mock the file response
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.content = self.image_data
@@ -68,7 +69,7 @@ class TestImageEndpoints(unittest.TestCase):
         print(f"Response status: {response.status_code}")
         print(f"mock_query called: {mock_query.called}")
         print(f"mock_query call_args: {mock_query.call_args}")
-        print(f"os.path.exists called with: {mock_exists.call_args_list}")
+        print(f"stat_file called with: {mock_exists.call_args_list}")
         
         if response.status_code != 200:
             print(f"Response text: {response.text}")
@@ -77,17 +78,18 @@ class TestImageEndpoints(unittest.TestCase):
         mock_query.assert_called_once()
         # Verify file existence was checked
         mock_exists.assert_called_with(self.predicted_image_path)
-        # Verify FileResponse was called with correct media type
-        mock_file_response.assert_called_with(self.predicted_image_path, media_type="image/jpeg")
+        # Verify the file was served with the correct media type
+        self.assertEqual(mock_file_response.call_args.args[1], self.predicted_image_path)
+        self.assertEqual(mock_file_response.call_args.kwargs["media_type"], "image/jpeg")
         
         self.assertEqual(response.status_code, 200)
 
-    @patch("controllers.image.os.path.exists", return_value=False)
+    @patch("controllers.image.stat_file", return_value=None)
     def test_get_image_file_not_found(self, mock_exists):
         response = self.client.get(f"/image/original/{self.image_filename}")
         self.assertEqual(response.status_code, 404)
 
-    @patch("controllers.image.os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     def test_get_image_invalid_type(self, mock_exists):
         response = self.client.get(f"/image/invalid_type/{self.image_filename}")
         self.assertEqual(response.status_code, 400)
@@ -98,7 +100,7 @@ class TestImageEndpoints(unittest.TestCase):
         response = self.client.get(f"/prediction/{self.uid}/image", headers=headers)
         self.assertEqual(response.status_code, 404)
 
-    @patch("controllers.image.os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     @patch("controllers.image.query_prediction_image_by_uid")
     def test_prediction_unsupported_accept_header(self, mock_query, mock_exists):
         print(f"\n=== Testing prediction_unsupported_accept_header ===")
@@ -119,11 +121,14 @@ class TestImageEndpoints(unittest.TestCase):
         
         self.assertEqual(response.status_code, 406)
 
-    # Additional test for PNG accept header
-    @patch("controllers.image.os.path.exists", return_value=True)
+    # Additional test for PNG accept header: the stored JPEG is transcoded
+    @patch("controllers.image.get_transcoded_variant", new_callable=AsyncMock)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("controllers.image.FileResponse")
-    def test_get_prediction_image_png_success(self, mock_file_response, mock_query, mock_exists):
+    @patch("controllers.image.conditional_file_response")
+    def test_get_prediction_image_png_success(self, mock_file_response, mock_query, mock_exists, mock_transcode):
+        png_path = self.predicted_image_path.replace(".jpg", ".png")
+        mock_transcode.return_value = png_path
         mock_session = MagicMock()
         mock_session.predicted_image = self.predicted_image_path
         mock_query.return_value = mock_session
@@ -136,9 +141,11 @@ class TestImageEndpoints(unittest.TestCase):
         response = self.client.get(f"/prediction/{self.uid}/image", headers=headers)
         
         self.assertEqual(response.status_code, 200)
-        mock_file_response.assert_called_with(self.predicted_image_path, media_type="image/png")
+        mock_transcode.assert_awaited_once_with(self.predicted_image_path, FAKE_STAT, "image/png")
+        self.assertEqual(mock_file_response.call_args.args[1], png_path)
+        self.assertEqual(mock_file_response.call_args.kwargs["media_type"], "image/png")
 
-    @patch("controllers.image.os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     @patch("controllers.image.query_prediction_image_by_uid")
     def test_prediction_image_file_not_found(self, mock_query, mock_exists):
         # Mock the database query to return a session, but file doesn't exist
@@ -146,8 +153,8 @@ class TestImageEndpoints(unittest.TestCase):
         mock_session.predicted_image = self.predicted_image_path
         mock_query.return_value = mock_session
         
-        # Override the exists mock to return False for the image file
-        mock_exists.return_value = False
+        # Override the stat mock to report the image file as missing
+        mock_exists.return_value = None
         
         headers = {"accept": "image/jpeg"}
         response = self.client.get(f"/prediction/{self.uid}/image", headers=headers)
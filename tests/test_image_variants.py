@@ -0,0 +1,162 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from PIL import Image
+from app import app
+from database.db import get_db
+from dependencies.auth import get_current_user_id
+from services import image_variants
+from services.image_variants import DiskLRUCache
+
+
+class TestDiskLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used_over_size_cap(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = DiskLRUCache(root, max_bytes=20)
+            for name in ("a", "b"):
+                tmp = cache.temp_path()
+                with open(tmp, "wb") as f:
+                    f.write(b"x" * 8)
+                cache.put(name, tmp)
+            cache.get("a")  # b is now least recently used
+            tmp = cache.temp_path()
+            with open(tmp, "wb") as f:
+                f.write(b"x" * 8)
+            cache.put("c", tmp)
+
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("b"))
+            self.assertFalse(os.path.exists(os.path.join(root, "b")))
+            self.assertEqual(cache.total_bytes, 16)
+
+    def test_index_rebuilt_from_disk(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "kept.jpg"), "wb") as f:
+                f.write(b"abc")
+
+            cache = DiskLRUCache(root, max_bytes=100)
+
+            self.assertEqual(cache.get("kept.jpg"), os.path.join(root, "kept.jpg"))
+            self.assertEqual(cache.total_bytes, 3)
+
+
+class TestResizedImageEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmpdir.name, "predicted"))
+        self.filename = "big-uid.jpg"
+        Image.new("RGB", (400, 200), "red").save(os.path.join(self.tmpdir.name, "predicted", self.filename))
+        self.cache = DiskLRUCache(os.path.join(self.tmpdir.name, "variants"), max_bytes=10 * 1024 * 1024)
+        self.patches = [
+            patch("controllers.image.UPLOADS_DIR", self.tmpdir.name),
+            patch.object(image_variants, "variant_cache", self.cache),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmpdir.cleanup()
+
+    def _size(self, content: bytes):
+        path = os.path.join(self.tmpdir.name, "out.jpg")
+        with open(path, "wb") as f:
+            f.write(content)
+        with Image.open(path) as img:
+            return img.size
+
+    def test_resize_keeps_aspect_ratio_and_is_cached(self):
+        with patch.object(image_variants, "render_variant", wraps=image_variants.render_variant) as render:
+            first = self.client.get(f"/image/predicted/{self.filename}", params={"width": 100})
+            second = self.client.get(f"/image/predicted/{self.filename}", params={"width": 100})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["content-type"], "image/jpeg")
+        self.assertEqual(self._size(first.content), (100, 50))
+        self.assertEqual(first.headers["etag"], second.headers["etag"])
+        self.assertEqual(render.call_count, 1)
+
+    def test_out_of_range_dimensions_rejected(self):
+        response = self.client.get(f"/image/predicted/{self.filename}", params={"width": 0})
+        self.assertEqual(response.status_code, 422)
+
+    def test_concurrent_requests_are_coalesced(self):
+        src = os.path.join(self.tmpdir.name, "predicted", self.filename)
+        st = os.stat(src)
+
+        async def _run():
+            return await asyncio.gather(
+                *[image_variants.get_resized_variant(src, st, 64, 64) for _ in range(5)]
+            )
+
+        with patch.object(image_variants, "render_variant", wraps=image_variants.render_variant) as render:
+            paths = asyncio.run(_run())
+
+        self.assertEqual(len(set(paths)), 1)
+        self.assertEqual(render.call_count, 1)
+
+
+class TestFormatNegotiation(unittest.TestCase):
+    @unittest.skipUnless("image/avif" in image_variants.FORMATS, "Pillow built without AVIF")
+    def test_prefers_smallest_encoding_among_equal_q(self):
+        self.assertEqual(image_variants.negotiate_image_type("image/avif,image/webp,*/*"), "image/avif")
+        self.assertEqual(image_variants.negotiate_image_type("image/webp,image/jpeg"), "image/webp")
+
+    def test_q_values_and_specificity(self):
+        self.assertEqual(image_variants.negotiate_image_type("image/webp;q=0.5, image/jpeg"), "image/jpeg")
+        self.assertEqual(image_variants.negotiate_image_type("image/*, image/avif;q=0"), "image/webp")
+        self.assertEqual(image_variants.negotiate_image_type("image/jpg"), "image/jpeg")
+
+    def test_no_acceptable_type(self):
+        self.assertIsNone(image_variants.negotiate_image_type("text/html"))
+        self.assertEqual(image_variants.negotiate_image_type(""), image_variants.PREFERRED_TYPES[0])
+
+
+class TestTranscodedPredictionImage(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "dog-uid.jpg")
+        Image.new("RGB", (64, 64), "blue").save(self.path)
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        self.query_patch = patch(
+            "controllers.image.query_prediction_image_by_uid", return_value=MagicMock(predicted_image=self.path)
+        )
+        self.query_patch.start()
+
+    def tearDown(self):
+        self.query_patch.stop()
+        app.dependency_overrides = {}
+        self.tmpdir.cleanup()
+
+    def test_webp_transcoded_and_cached_next_to_original(self):
+        response = self.client.get("/prediction/uid/image", headers={"Accept": "image/webp,image/jpeg;q=0.8"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/webp")
+        self.assertEqual(response.content[8:12], b"WEBP")
+        sidecar = os.path.join(self.tmpdir.name, "dog-uid.webp")
+        self.assertTrue(os.path.exists(sidecar))
+
+        with patch.object(image_variants, "render_variant") as render:
+            again = self.client.get("/prediction/uid/image", headers={"Accept": "image/webp"})
+        render.assert_not_called()
+        self.assertEqual(again.content, response.content)
+
+    def test_jpeg_served_without_transcoding(self):
+        with patch.object(image_variants, "render_variant") as render:
+            response = self.client.get("/prediction/uid/image", headers={"Accept": "image/jpeg"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/jpeg")
+        render.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
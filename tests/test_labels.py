@@ -2,10 +2,12 @@ import unittest
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from app import app
+from services.cache import response_cache
 
 class TestLabelsEndpoint(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
+        response_cache.clear()
 
     @patch("controllers.labels.query_unique_labels_last_week")
     def test_labels_endpoint(self, mock_query):
@@ -7,6 +7,8 @@ from app import app  # adjust as needed
 from database.db import get_db
 from dependencies.auth import get_current_user_id
 
+FAKE_STAT = os.stat_result((0o100644, 0, 0, 1, 0, 0, 15, 0, 1700000000, 0))
+
 class TestGetPredictionImageEndpoint(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
@@ -35,7 +37,7 @@ class TestGetPredictionImageEndpoint(unittest.TestCase):
    
 
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     def test_unsupported_accept_header(self, mock_exists, mock_query):
         self.override_dependencies()
 
@@ -50,7 +52,7 @@ class TestGetPredictionImageEndpoint(unittest.TestCase):
         self.assertEqual(response.json()["detail"], "Client does not accept an image format")
 
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("os.path.exists", return_value=False)
+    @patch("controllers.image.stat_file", return_value=None)
     def test_image_file_missing(self, mock_exists, mock_query):
         self.override_dependencies()
 
@@ -66,9 +68,9 @@ class TestGetPredictionImageEndpoint(unittest.TestCase):
         
 
 
-    @patch("controllers.image.FileResponse")
+    @patch("controllers.image.conditional_file_response")
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     def test_valid_jpeg_request(self, mock_exists, mock_query, mock_file_response):
         self.override_dependencies()
 
@@ -86,9 +88,9 @@ class TestGetPredictionImageEndpoint(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.headers["content-type"], "image/jpeg")
         
-    @patch("controllers.image.FileResponse")
+    @patch("controllers.image.conditional_file_response")
     @patch("controllers.image.query_prediction_image_by_uid")
-    @patch("os.path.exists", return_value=True)
+    @patch("controllers.image.stat_file", return_value=FAKE_STAT)
     def test_valid_jpg_request(self, mock_exists, mock_query, mock_file_response):
         self.override_dependencies()
 
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from app import app
+from database.db import get_db
+from dependencies.auth import get_current_user_id
+
+
+class TestPredictUpload(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.mock_db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+        app.dependency_overrides[get_current_user_id] = lambda: 7
+        self.publisher = MagicMock()
+        self.publisher.publish_job = AsyncMock()
+        self.patches = [
+            patch("controllers.prediction.UPLOAD_DIR", self.tmpdir.name),
+            patch("controllers.prediction.get_publisher", return_value=self.publisher),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        app.dependency_overrides = {}
+        self.tmpdir.cleanup()
+
+    def test_multipart_upload_is_stored_and_queued(self):
+        content = os.urandom(300 * 1024)
+        response = self.client.post(
+            "/predict",
+            files={"file": ("beatles.jpeg", content, "image/jpeg")},
+            data={"chat_id": "chat-9"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["status"], "queued")
+        uid = body["prediction_uid"]
+
+        job = self.publisher.publish_job.await_args.args[0]
+        self.assertEqual(job["prediction_uid"], uid)
+        self.assertEqual(job["user_id"], 7)
+        self.assertEqual(job["source"], "path")
+        self.assertEqual(job["chat_id"], "chat-9")
+        self.assertEqual(os.path.basename(job["path"]), f"beatles-{uid}.jpeg")
+        with open(job["path"], "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_raw_image_body(self):
+        response = self.client.post("/predict", content=b"\x89PNG-bytes", headers={"content-type": "image/png"})
+
+        self.assertEqual(response.status_code, 200)
+        job = self.publisher.publish_job.await_args.args[0]
+        self.assertTrue(job["path"].endswith(".png"))
+
+    def test_s3_key_without_body(self):
+        response = self.client.post("/predict", params={"img": "incoming/cat.jpg"})
+
+        self.assertEqual(response.status_code, 200)
+        job = self.publisher.publish_job.await_args.args[0]
+        self.assertEqual(job["img"], "incoming/cat.jpg")
+        self.assertNotIn("path", job)
+
+    def test_missing_file_part(self):
+        response = self.client.post("/predict", data={"chat_id": "x"}, files={"other": ("a.txt", b"x")})
+
+        self.assertEqual(response.status_code, 400)
+        self.publisher.publish_job.assert_not_awaited()
+
+    def test_oversized_upload_rejected(self):
+        with patch("services.uploads.MAX_UPLOAD_BYTES", 1024):
+            response = self.client.post("/predict", files={"file": ("a.jpg", b"x" * 4096, "image/jpeg")})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_queue_unavailable_removes_upload(self):
+        self.publisher.publish_job.side_effect = ConnectionError("broker down")
+
+        response = self.client.post("/predict", files={"file": ("a.jpg", b"abc", "image/jpeg")})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    @patch("controllers.prediction.WAIT_FALLBACK_POLL_SECONDS", 0.05)
+    @patch("controllers.prediction.get_detection_objects")
+    @patch("controllers.prediction.get_prediction_session")
+    def test_wait_returns_completed_result(self, mock_session, mock_objects):
+        mock_session.side_effect = [None, MagicMock(uid="u", timestamp="t", original_image="o", predicted_image="p")]
+        mock_objects.return_value = [MagicMock(id=1, label="dog", score=0.9, box="[0, 0, 1, 1]")]
+
+        response = self.client.post(
+            "/predict", files={"file": ("a.jpg", b"abc", "image/jpeg")}, params={"wait": 5}
+        )
+
+        body = response.json()
+        self.assertEqual(body["status"], "completed")
+        self.assertEqual(body["labels"], ["dog"])
+
+    @patch("controllers.prediction.get_prediction_session", return_value=None)
+    def test_wait_times_out_as_queued(self, mock_session):
+        response = self.client.post(
+            "/predict", files={"file": ("a.jpg", b"abc", "image/jpeg")}, params={"wait": 0.2}
+        )
+
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertGreaterEqual(mock_session.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,13 @@ import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from app import app  # adjust import path if needed
+from services.cache import response_cache
 from database.db import get_db
 
 class TestGetPredictionCountLastWeek(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
+        response_cache.clear()
         self.mock_db = MagicMock()
         app.dependency_overrides[get_db] = lambda: self.mock_db
 
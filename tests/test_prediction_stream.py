@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from app import app
+from database.db import get_db
+from dependencies.auth import get_current_user_id
+from services.prediction_stream import PredictionEventHub
+
+
+def _event(uid, user_id=1):
+    return {"prediction_uid": uid, "user_id": user_id, "labels": ["dog"], "detection_count": 1, "chat_id": None}
+
+
+class TestPredictionEventHub(unittest.TestCase):
+    def test_fans_out_only_to_the_owner(self):
+        async def _run():
+            hub = PredictionEventHub()
+            mine, _ = hub.subscribe(1)
+            theirs, _ = hub.subscribe(2)
+            hub.handle_event("images.processed", _event("a", user_id=1))
+            return mine.get_nowait(), theirs.empty()
+
+        (event_id, payload), theirs_empty = asyncio.run(_run())
+        self.assertEqual(payload["prediction_uid"], "a")
+        self.assertTrue(theirs_empty)
+
+    def test_resume_from_last_event_id(self):
+        async def _run():
+            hub = PredictionEventHub()
+            first = hub.publish(_event("a"))
+            hub.publish(_event("b"))
+            _, resumed = hub.subscribe(1, first)
+            _, foreign = hub.subscribe(1, "otherboot:1")
+            _, fresh = hub.subscribe(1)
+            return resumed, foreign, fresh
+
+        resumed, foreign, fresh = asyncio.run(_run())
+        self.assertEqual([p["prediction_uid"] for _, p in resumed], ["b"])
+        self.assertEqual([p["prediction_uid"] for _, p in foreign], ["a", "b"])
+        self.assertEqual(fresh, [])
+
+    def test_slow_subscriber_is_dropped(self):
+        async def _run():
+            hub = PredictionEventHub(queue_size=1)
+            queue, _ = hub.subscribe(1)
+            hub.publish(_event("a"))
+            hub.publish(_event("b"))
+            return queue.get_nowait(), hub._subscribers
+
+        sentinel, subscribers = asyncio.run(_run())
+        self.assertIsNone(sentinel)
+        self.assertNotIn(1, subscribers)
+
+    def test_wait_for_uid(self):
+        async def _run():
+            hub = PredictionEventHub()
+            waiter = asyncio.ensure_future(hub.wait_for("a", 1))
+            await asyncio.sleep(0)
+            hub.publish(_event("a"))
+            return await waiter, await hub.wait_for("missing", 0.01)
+
+        found, missing = asyncio.run(_run())
+        self.assertEqual(found["prediction_uid"], "a")
+        self.assertIsNone(missing)
+
+
+class TestPredictionStreamEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.hub = PredictionEventHub()
+        self.patches = [
+            patch("controllers.stream.prediction_hub", self.hub),
+            patch("controllers.stream.KEEPALIVE_SECONDS", 0.05),
+        ]
+        for p in self.patches:
+            p.start()
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        app.dependency_overrides = {}
+
+    def test_sse_replays_missed_events(self):
+        self.hub.publish(_event("a"))
+        self.hub.publish(_event("b"))
+
+        with self.client.stream(
+            "GET", "/predictions/stream", headers={"Last-Event-ID": f"{self.hub.boot}:1"}
+        ) as response:
+            self.assertEqual(response.headers["content-type"], "text/event-stream; charset=utf-8")
+            lines = []
+            for line in response.iter_lines():
+                lines.append(line)
+                if line.startswith("data:"):
+                    break
+
+        self.assertIn(f"id: {self.hub.boot}:2", lines)
+        self.assertIn('"prediction_uid": "b"', lines[-1])
+
+    @patch("controllers.stream.get_websocket_user_id")
+    def test_websocket_replays_with_last_event_id(self, _):
+        from dependencies.auth import get_websocket_user_id
+
+        app.dependency_overrides[get_websocket_user_id] = lambda: 1
+        self.hub.publish(_event("a"))
+        self.hub.publish(_event("b", user_id=2))
+
+        with self.client.websocket_connect(f"/ws/predictions?last_event_id={self.hub.boot}:0") as ws:
+            message = ws.receive_json()
+
+        self.assertEqual(message["event"]["prediction_uid"], "a")
+        self.assertEqual(message["id"], f"{self.hub.boot}:1")
+
+    def test_websocket_rejects_bad_password(self):
+        db = MagicMock()
+        db.query.return_value.filter_by.return_value.first.return_value = MagicMock(id=3, password="right")
+        app.dependency_overrides[get_db] = lambda: db
+        token = base64.b64encode(b"alice:wrong").decode()
+
+        with self.assertRaises(Exception):
+            with self.client.websocket_connect("/ws/predictions", headers={"Authorization": f"Basic {token}"}) as ws:
+                ws.receive_json()
+
+
+if __name__ == "__main__":
+    unittest.main()
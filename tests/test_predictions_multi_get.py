@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app import app
+from database.db import Base, get_db
+from dependencies.auth import get_current_user_id
+from queries.queries import save_detection_object, save_prediction_session
+
+
+class TestPredictionsMultiGet(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmpdir.name, 'multi.db')}", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+
+        db = self.SessionLocal()
+        save_prediction_session(db, "u1", "o1", "p1", 1)
+        save_prediction_session(db, "u2", "o2", "p2", 1)
+        save_prediction_session(db, "other", "o3", "p3", 2)
+        save_detection_object(db, "u1", "dog", 0.9, "[]")
+        save_detection_object(db, "u1", "cat", 0.7, "[]")
+        save_detection_object(db, "other", "car", 0.6, "[]")
+        db.close()
+
+        def override_get_db():
+            db = self.SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_get_returns_owned_predictions_in_two_queries(self):
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        response = self.client.get("/predictions", params={"uids": "u2,u1,other,nope"})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([p["uid"] for p in body["predictions"]], ["u2", "u1"])
+        self.assertEqual([d["label"] for d in body["predictions"][1]["detection_objects"]], ["dog", "cat"])
+        self.assertEqual(body["predictions"][0]["detection_objects"], [])
+        self.assertEqual(body["missing"], ["other", "nope"])
+        self.assertEqual(len([s for s in statements if s.lstrip().upper().startswith("SELECT")]), 2)
+
+    def test_post_body_and_repeated_params(self):
+        post = self.client.post("/predictions/query", json={"uids": ["u1", "u1", "u2"]})
+        get = self.client.get("/predictions?uids=u1&uids=u2")
+
+        self.assertEqual([p["uid"] for p in post.json()["predictions"]], ["u1", "u2"])
+        self.assertEqual(get.json(), post.json())
+
+    def test_list_size_is_capped(self):
+        with patch("controllers.prediction.MAX_MULTI_GET", 2):
+            response = self.client.post("/predictions/query", json={"uids": ["a", "b", "c"]})
+        self.assertEqual(response.status_code, 413)
+
+    def test_empty_list_rejected(self):
+        response = self.client.post("/predictions/query", json={"uids": []})
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from app import app
+from database.db import get_db
+from services import event_listener
+from services.cache import InMemoryBackend, ResponseCache, response_cache
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_ttl_expiry(self):
+        cache = ResponseCache(local=InMemoryBackend(), ttl=0.05)
+        compute = MagicMock(side_effect=[1, 2])
+
+        self.assertEqual(cache.get_or_set("k", compute), 1)
+        self.assertEqual(cache.get_or_set("k", compute), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.get_or_set("k", compute), 2)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_size_bound_evicts_least_recently_used(self):
+        backend = InMemoryBackend(max_entries=2)
+        cache = ResponseCache(local=backend, ttl=60)
+        cache.get_or_set("a", lambda: "a")
+        cache.get_or_set("b", lambda: "b")
+        cache.get_or_set("a", lambda: "stale")  # touch a
+        cache.get_or_set("c", lambda: "c")
+
+        self.assertEqual(len(backend), 2)
+        self.assertEqual(cache.get_or_set("a", lambda: "recomputed"), "a")
+        self.assertEqual(cache.get_or_set("b", lambda: "recomputed"), "recomputed")
+
+    def test_shared_backend_populates_local_tier(self):
+        shared = InMemoryBackend()
+        first = ResponseCache(local=InMemoryBackend(), shared=shared, ttl=60)
+        second = ResponseCache(local=InMemoryBackend(), shared=shared, ttl=60)
+
+        first.get_or_set("k", lambda: 5)
+        compute = MagicMock(return_value=6)
+        self.assertEqual(second.get_or_set("k", compute), 5)
+        compute.assert_not_called()
+
+    def test_images_processed_event_invalidates(self):
+        cache = ResponseCache(local=InMemoryBackend(), ttl=60)
+        cache.get_or_set("k", lambda: 1)
+
+        cache.invalidate(min_age=0)
+        self.assertEqual(cache.get_or_set("k", lambda: 2), 2)
+
+        cache.handle_event("images.processed", {})  # entry is younger than min age
+        self.assertEqual(cache.get_or_set("k", lambda: 3), 2)
+
+
+class TestCachedEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        response_cache.clear()
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        response_cache.clear()
+
+    @patch("controllers.stats.query_prediction_count_last_week", return_value=3)
+    def test_count_served_from_cache_until_event(self, mock_count):
+        self.assertEqual(self.client.get("/predictions/count").json(), {"count": 3})
+        self.assertEqual(self.client.get("/predictions/count").json(), {"count": 3})
+        self.assertEqual(mock_count.call_count, 1)
+
+        with patch.object(response_cache.local, "invalidate", wraps=response_cache.local.invalidate) as spy:
+            asyncio.run(event_listener.dispatch("images.processed", {"prediction_uid": "x"}))
+            spy.assert_called_once()
+        response_cache.invalidate(min_age=0)
+        self.client.get("/predictions/count")
+        self.assertEqual(mock_count.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()